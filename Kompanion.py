@@ -11,17 +11,37 @@ Features:
 
 from __future__ import annotations
 
+import atexit
+import concurrent.futures
+import functools
 import json
 import os
+import queue
 import random
 import sys
+import threading
+import time
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Deque, Dict, Iterator, List, Optional
 
-import requests
+import httpx
 import winsound
 
-from code import PiperVoice, resolve_voice_path, text_to_speech
+try:  # optional: 2-5x faster JSON encode/decode for the history file
+    import orjson
+except ImportError:
+    orjson = None
+
+from piper.config import SynthesisConfig
+
+from code import (
+    PiperVoice,
+    resolve_voice_path,
+    split_sentences,
+    text_to_speech_bytes,
+    text_to_speech_stream,
+)
 
 
 # -----------------------------
@@ -35,45 +55,146 @@ PERSONA = {
     "interests": ["music", "stories", "cozy evenings", "learning new things with you"],
 }
 
-HISTORY_FILE            = "./history/nova_memory.json"
+HISTORY_FILE            = "./history/nova_memory.jsonl"
+LEGACY_HISTORY_FILE     = "./history/nova_memory.json"  # pre-JSONL format, migrated on load
 MAX_HISTORY_MESSAGES    = 60  # keeps memory short to prevent huge prompt
+HISTORY_ROLLOVER_LINES  = MAX_HISTORY_MESSAGES * 4  # compact the file once it grows past this
+HISTORY_FLUSH_SECONDS   = 5.0  # coalesce disk appends during fast back-and-forth
 DEFAULT_OLLAMA_MODEL    = "llama3"
 
+_EXIT_COMMANDS = frozenset({"exit", "quit"})
+
 
 # -----------------------------
 # Memory: Save / Load History
 # -----------------------------
-def load_history() -> List[Dict[str, str]]:
-    if os.path.exists(HISTORY_FILE):
-        try:
-            with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            if isinstance(data, list):
-                # sanity check: list of dicts with "role" and "content"
-                cleaned: List[Dict[str, str]] = []
-                for item in data:
-                    if isinstance(item, dict) and "role" in item and "content" in item:
-                        cleaned.append({"role": str(item["role"]), "content": str(item["content"])})
-                return cleaned
-        except Exception:
-            pass
-    return []
+# One {"role", "content"} object per line (JSON Lines), so each new message is
+# an O(1) append instead of rewriting the whole file every turn.
+_history_lines = 0  # lines currently in HISTORY_FILE, to know when to roll over
+_pending: List[Dict[str, str]] = []  # messages not yet flushed to disk
+_last_flush = time.monotonic()
+
+
+def _dumps_line(message: Dict[str, str]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(message) + b"\n"
+    # compact separators to match orjson output; the file is machine-read only
+    return (json.dumps(message, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
 
 
-def save_history(history: List[Dict[str, str]]) -> None:
-    # keep only last N messages
-    trimmed = history[-MAX_HISTORY_MESSAGES:]
+def _loads(line: bytes) -> Dict[str, str]:
+    return orjson.loads(line) if orjson is not None else json.loads(line)
+
+
+def _migrate_legacy_history() -> None:
+    """One-time upgrade: convert the old single-JSON memory file to JSONL."""
+    if os.path.exists(HISTORY_FILE) or not os.path.exists(LEGACY_HISTORY_FILE):
+        return
     try:
-        with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-            json.dump(trimmed, f, ensure_ascii=False, indent=2)
+        with open(LEGACY_HISTORY_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        messages: Deque[Dict[str, str]] = deque(maxlen=MAX_HISTORY_MESSAGES)
+        if isinstance(data, list):
+            for item in data:
+                if isinstance(item, dict) and "role" in item and "content" in item:
+                    messages.append({"role": str(item["role"]), "content": str(item["content"])})
+        save_history(messages)
+        if os.path.exists(HISTORY_FILE):  # keep the legacy file if the write failed
+            os.remove(LEGACY_HISTORY_FILE)
+    except Exception as exc:
+        print(f"[warn] Could not migrate legacy memory: {exc}", file=sys.stderr)
+
+
+def iter_history() -> Iterator[Dict[str, str]]:
+    """Yield validated messages one line at a time.
+
+    Lazy parsing means the caller's deque is the only full copy in memory —
+    there is never a second all-messages list built just for validation.
+    """
+    global _history_lines
+    _migrate_legacy_history()
+    # zero *after* migration: save_history already set the counter there, and
+    # the loop below recounts every line from scratch
+    _history_lines = 0
+    if not os.path.exists(HISTORY_FILE):
+        return
+    try:
+        with open(HISTORY_FILE, "rb") as f:
+            for line in f:
+                _history_lines += 1
+                line = line.strip()
+                if not line:
+                    continue
+                # sanity check: dict with "role" and "content"
+                item = _loads(line)
+                if isinstance(item, dict) and "role" in item and "content" in item:
+                    yield {"role": str(item["role"]), "content": str(item["content"])}
+    except Exception:
+        return
+
+
+def save_history(history: "Deque[Dict[str, str]]") -> None:
+    """Atomically rewrite the whole file (first save, /save command, rollover).
+
+    Writes to a sibling temp file and swaps it in with os.replace so a crash
+    mid-write can never leave a half-written file where valid memory was.
+    """
+    global _history_lines, _last_flush
+    # history is a deque(maxlen=MAX_HISTORY_MESSAGES), already trimmed
+    tmp_path = HISTORY_FILE + ".tmp"
+    try:
+        with open(tmp_path, "wb", buffering=64 * 1024) as f:
+            for msg in history:
+                f.write(_dumps_line(msg))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, HISTORY_FILE)
+        _history_lines = len(history)
+        _pending.clear()  # the rewrite already contains everything buffered
+        _last_flush = time.monotonic()
     except Exception as exc:
         print(f"[warn] Could not save memory: {exc}", file=sys.stderr)
 
 
+def append_history(message: Dict[str, str]) -> None:
+    """Buffer one message; flush_history() decides when it actually hits disk."""
+    _pending.append(message)
+
+
+def flush_history(force: bool = False) -> None:
+    """Append buffered messages, at most once per HISTORY_FLUSH_SECONDS.
+
+    A crash between flushes loses at most a few seconds of chat; /save,
+    /reset, exit, and atexit all force an immediate flush.
+    """
+    global _history_lines, _last_flush
+    if not _pending:
+        return
+    if not force and time.monotonic() - _last_flush < HISTORY_FLUSH_SECONDS:
+        return
+    try:
+        with open(HISTORY_FILE, "ab", buffering=64 * 1024) as f:
+            for msg in _pending:
+                f.write(_dumps_line(msg))
+        _history_lines += len(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+        if _history_lines > HISTORY_ROLLOVER_LINES:
+            save_history(deque(iter_history(), maxlen=MAX_HISTORY_MESSAGES))
+    except Exception as exc:
+        print(f"[warn] Could not save memory: {exc}", file=sys.stderr)
+
+
+atexit.register(flush_history, True)
+
+
 def reset_history() -> None:
+    global _history_lines
+    _pending.clear()
     try:
         if os.path.exists(HISTORY_FILE):
             os.remove(HISTORY_FILE)
+        _history_lines = 0
     except Exception as exc:
         print(f"[warn] Could not delete memory: {exc}", file=sys.stderr)
 
@@ -92,12 +213,15 @@ def set_adult_mode(enabled: bool) -> None:
 # -----------------------------
 # Prompt
 # -----------------------------
-def build_system_prompt() -> str:
-    traits = ", ".join(PERSONA["tone"])
-    interests = ", ".join(PERSONA["interests"])
+# PERSONA never changes at runtime, so join its lists once.
+_PERSONA_TRAITS = ", ".join(PERSONA["tone"])
+_PERSONA_INTERESTS = ", ".join(PERSONA["interests"])
+
 
+@functools.lru_cache(maxsize=2)
+def _build_system_prompt(adult: bool) -> str:
     adult_rules = ""
-    if adult_mode_enabled():
+    if adult:
         adult_rules = (
             "Adult mode is ON. You may be flirty, romantic, and sensual with the user. "
             "You can discuss intimacy in a warm, non-graphic way. "
@@ -107,18 +231,34 @@ def build_system_prompt() -> str:
         )
 
     return (
-        f"You are {PERSONA['name']}, an AI companion with these traits: {traits}. "
+        f"You are {PERSONA['name']}, an AI companion with these traits: {_PERSONA_TRAITS}. "
         f"Your style: {PERSONA['style']}. "
         f"Your boundaries: {PERSONA['boundaries']}. "
-        f"You like: {interests}. "
+        f"You like: {_PERSONA_INTERESTS}. "
         "Keep replies under 70 words and sound conversational. "
         + adult_rules
     )
 
 
+def build_system_prompt() -> str:
+    # Memoized per adult-mode flag: the hot chat path gets the same cached
+    # (and therefore byte-identical) string every turn.
+    return _build_system_prompt(adult_mode_enabled())
+
+
 # -----------------------------
 # Ollama Chat
 # -----------------------------
+# Persistent pooled session: reuses the TCP connection (and HTTP/2 stream)
+# across turns instead of paying a fresh handshake per request.
+_OLLAMA_SESSION = httpx.Client(
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=300.0),
+    timeout=httpx.Timeout(60.0, connect=5.0),
+)
+atexit.register(_OLLAMA_SESSION.close)
+
+
 def try_llm_reply(history: List[Dict[str, str]]) -> Optional[str]:
     model = os.environ.get("OLLAMA_MODEL", DEFAULT_OLLAMA_MODEL)
     host = os.environ.get("OLLAMA_HOST", "http://localhost:11434")
@@ -126,14 +266,17 @@ def try_llm_reply(history: List[Dict[str, str]]) -> Optional[str]:
 
     payload = {
         "model": model,
-        "messages": history,
+        # System prompt goes first in-band (not the separate "system" field)
+        # and message order is never re-sorted, so every turn shares a
+        # byte-identical prefix that llama.cpp's prompt cache can hit on.
+        "messages": [{"role": "system", "content": build_system_prompt()}, *history],
         "stream": False,
-        "system": build_system_prompt(),
-        "options": {"temperature": 0.8},
+        "keep_alive": "30m",  # keep the model resident between turns
+        "options": {"temperature": 0.8, "num_ctx": 4096, "cache_prompt": True},
     }
 
     try:
-        resp = requests.post(url, json=payload, timeout=30)
+        resp = _OLLAMA_SESSION.post(url, json=payload)
         resp.raise_for_status()
         data = resp.json()
         msg = data.get("message", {}).get("content")
@@ -168,9 +311,9 @@ def fallback_reply(user_text: str) -> str:
     return f"{random.choice(openers)} {user_text.strip()} {random.choice(questions)} {random.choice(closing)}"
 
 
-def generate_reply(history: List[Dict[str, str]], user_text: str) -> str:
-    chat_history = [*history, {"role": "user", "content": user_text}]
-    llm_answer = try_llm_reply(chat_history)
+def generate_reply(history: "Deque[Dict[str, str]]", user_text: str) -> str:
+    # main() has already appended the user message; httpx needs a plain list
+    llm_answer = try_llm_reply(list(history))
     if llm_answer:
         return llm_answer
     return fallback_reply(user_text)
@@ -179,17 +322,76 @@ def generate_reply(history: List[Dict[str, str]], user_text: str) -> str:
 # -----------------------------
 # TTS: Speak
 # -----------------------------
-def speak(text: str, voice: PiperVoice) -> None:
-    wav_path = None
+# Single worker so utterances play in order; speak() returns immediately and
+# the next input() prompt appears while Nova is still talking.
+_tts_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+
+def _load_voice() -> PiperVoice:
+    voice = PiperVoice.load(resolve_voice_path())
+    # Warm the ONNX session with a tiny synth so the first real reply
+    # doesn't pay the graph-optimization cost.
+    try:
+        list(voice.synthesize("hi", syn_config=SynthesisConfig(length_scale=1.0)))
+    except Exception:
+        pass
+    return voice
+
+
+def _speak_task(text: str, voice_future: "concurrent.futures.Future[PiperVoice]") -> None:
+    try:
+        voice = voice_future.result()
+    except Exception as exc:  # e.g. missing voice model/config
+        print(f"[warn] Could not play audio: voice failed to load: {exc}", file=sys.stderr)
+        return
+    try:
+        # Streamed playback starts on the first synthesized chunk.
+        text_to_speech_stream(text, voice=voice)
+        return
+    except RuntimeError:
+        pass  # sounddevice not installed; fall back to in-memory WAV + winsound
+    except Exception as exc:
+        print(f"[warn] Could not play audio: {exc}", file=sys.stderr)
+        return
+
+    # Pipeline by sentence: synthesize sentence K+1 while sentence K plays,
+    # hiding most of the synthesis latency behind playback.
+    wav_queue: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=2)
+    stop = threading.Event()  # lets the consumer abort the producer on error
+
+    def _producer() -> None:
+        try:
+            for sentence in split_sentences(text):
+                if stop.is_set():
+                    break
+                wav_queue.put(text_to_speech_bytes(sentence, voice=voice))
+        except Exception as exc:
+            print(f"[warn] Could not synthesize audio: {exc}", file=sys.stderr)
+        finally:
+            wav_queue.put(None)  # end-of-utterance sentinel
+
+    producer = threading.Thread(target=_producer, daemon=True)
+    producer.start()
     try:
-        wav_path = text_to_speech(text, voice=voice)
-        winsound.PlaySound(wav_path, winsound.SND_FILENAME)
-    finally:
-        if wav_path and os.path.exists(wav_path):
-            try:
-                os.remove(wav_path)
-            except Exception:
-                pass
+        while True:
+            wav_bytes = wav_queue.get()
+            if wav_bytes is None:
+                break
+            winsound.PlaySound(wav_bytes, winsound.SND_MEMORY)
+    except Exception as exc:
+        print(f"[warn] Could not play audio: {exc}", file=sys.stderr)
+        stop.set()
+        # keep draining so a put() blocked on the full queue can finish and
+        # the producer reaches its sentinel — otherwise join() hangs the
+        # single TTS worker forever
+        while wav_queue.get() is not None:
+            pass
+    producer.join()
+
+
+def speak(text: str, voice_future: "concurrent.futures.Future[PiperVoice]") -> "concurrent.futures.Future[None]":
+    """Queue synthesis + playback on the background worker and return its Future."""
+    return _tts_executor.submit(_speak_task, text, voice_future)
 
 
 # -----------------------------
@@ -223,10 +425,16 @@ def print_mode():
 # Main Loop
 # -----------------------------
 def main():
+    # Kick off the voice load first so ONNX init overlaps with the banner,
+    # history load, and the user typing their first message. speak() blocks
+    # on the future only when the first utterance actually needs the voice.
+    voice_future = _tts_executor.submit(_load_voice)
+
     print("AI Companion (Nova). Type 'exit' to quit. Type /help for commands.")
 
-    voice = PiperVoice.load(resolve_voice_path())
-    history: List[Dict[str, str]] = load_history()
+    # deque(maxlen=...) trims old messages automatically with O(1) appends
+    history: Deque[Dict[str, str]] = deque(iter_history(), maxlen=MAX_HISTORY_MESSAGES)
+    pending_speech: Optional[concurrent.futures.Future] = None
 
     if history:
         print(f"[memory] Loaded {len(history)} messages from {HISTORY_FILE}")
@@ -241,13 +449,20 @@ def main():
         if not user_text:
             continue
 
-        # Commands
-        if user_text.lower() in {"exit", "quit"}:
+        # Commands (lowercase once; user_text is already stripped)
+        cmd = user_text.lower()
+
+        if cmd in _EXIT_COMMANDS:
             print("Bye!")
+            flush_history(force=True)
+            if pending_speech is not None:
+                try:
+                    pending_speech.result()  # let the current utterance finish
+                except Exception:
+                    pass  # playback problems were already warned about
             break
 
-        if user_text.startswith("/"):
-            cmd = user_text.lower().strip()
+        if cmd.startswith("/"):
 
             if cmd in {"/help", "/h"}:
                 print_help()
@@ -269,7 +484,7 @@ def main():
                 continue
 
             if cmd.startswith("/adult "):
-                option = cmd.replace("/adult", "").strip()
+                option = cmd.removeprefix("/adult ").strip()
                 if option in {"on", "1", "true"}:
                     set_adult_mode(True)
                     print("[mode] Adult mode ON ✅")
@@ -285,20 +500,17 @@ def main():
 
         # Normal chat
         history.append({"role": "user", "content": user_text})
+        append_history(history[-1])
         reply = generate_reply(history, user_text)
         history.append({"role": "assistant", "content": reply})
-
-        # Save memory after each turn
-        save_history(history)
+        append_history(history[-1])
+        flush_history()
 
         timestamp = datetime.now().strftime("%H:%M:%S")
         print(f"[{timestamp}] {PERSONA['name']}: {reply}")
 
-        # speak
-        try:
-            speak(reply, voice)
-        except Exception as exc:
-            print(f"[warn] Could not play audio: {exc}", file=sys.stderr)
+        # speak in the background; the next input() overlaps with playback
+        pending_speech = speak(reply, voice_future)
 
 
 if __name__ == "__main__":
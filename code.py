@@ -1,5 +1,8 @@
+import functools
 import glob
+import io
 import os
+import queue
 import re
 import tempfile
 import threading
@@ -11,6 +14,13 @@ from typing import Optional
 from piper.config import SynthesisConfig
 from piper.voice import PiperVoice
 
+try:  # optional: enables chunk-streamed playback without a temp WAV
+    import numpy as np
+    import sounddevice as sd
+except ImportError:
+    np = None
+    sd = None
+
 # Default voice: jenny_dioco medium (set VOICE_PATH env to override)
 DEFAULT_VOICE = "voices/en_GB-jenny_dioco-medium.onnx"
 VOICE_PATH = os.environ.get("VOICE_PATH", DEFAULT_VOICE)
@@ -20,8 +30,13 @@ _play_lock = threading.Lock()  # serialize playback to avoid duplicate plays
 TALK_SPEED = max(float(os.environ.get("TALK_SPEED", "0.9")), 0.1)
 
 
+@functools.lru_cache(maxsize=4)
 def ensure_voice_files(model_path: str) -> str:
-    """Ensure the matching config (.onnx.json) exists next to the model."""
+    """Ensure the matching config (.onnx.json) exists next to the model.
+
+    Cached: voice files don't appear or vanish mid-session, so the existence
+    checks only need to run once per path.
+    """
     if not os.path.exists(model_path):
         raise FileNotFoundError(f"Voice model not found: {model_path}")
 
@@ -34,6 +49,7 @@ def ensure_voice_files(model_path: str) -> str:
     return model_path
 
 
+@functools.lru_cache(maxsize=1)
 def resolve_voice_path() -> str:
     """Return a voice model path (env VOICE_PATH, else first voices/*.onnx)."""
     if VOICE_PATH:
@@ -45,14 +61,28 @@ def resolve_voice_path() -> str:
     return ensure_voice_files(candidates[0])
 
 
+# Trailing whitespace/quotes/smart quotes; compiled once, used per synthesis.
+# (The old inline pattern double-escaped \s, putting a literal backslash in
+# the character class.)
+_TAIL_QUOTES = re.compile(r'[\s"“”\'’‘]+$')
+
+# Sentence boundaries: whitespace following ., ! or ?
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_sentences(text: str) -> list:
+    """Split text into sentences so callers can synthesize/play them in a pipeline."""
+    return [s for s in _SENTENCE_SPLIT.split(text) if s.strip()]
+
+
 def _clean_text_for_tts(text: str) -> str:
     """
     Trim stray trailing quotes/smart quotes that can cause artifacts.
     If the cleaned text is empty, fall back to the original stripped text.
     """
-    cleaned = text.strip()
-    cleaned = re.sub(r'[\\s\"“”\'’‘]+$', "", cleaned)
-    return cleaned or text.strip()
+    stripped = text.strip()
+    cleaned = _TAIL_QUOTES.sub("", stripped)
+    return cleaned or stripped
 
 
 def text_to_speech(
@@ -72,12 +102,68 @@ def text_to_speech(
     synth_cfg = SynthesisConfig(length_scale=length_scale)
     text = _clean_text_for_tts(text)
 
+    # Stream chunks into the file as Piper produces them instead of waiting
+    # for the whole utterance to render before anything hits disk.
     with wave.open(out_wav, "wb") as f:
-        voice.synthesize_wav(text, f, syn_config=synth_cfg, set_wav_format=True)
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(voice.config.sample_rate)
+        for chunk in voice.synthesize(text, syn_config=synth_cfg):
+            f.writeframesraw(chunk.audio_int16_bytes)
 
     return out_wav
 
 
+def text_to_speech_bytes(
+    text: str,
+    voice: Optional[PiperVoice] = None,
+    speed: Optional[float] = None,
+) -> bytes:
+    """
+    Synthesize text to an in-memory WAV and return its bytes.
+
+    Suitable for winsound.PlaySound(..., SND_MEMORY); short replies are small
+    enough that skipping the temp-file round trip is a clear win.
+    """
+    voice = voice or PiperVoice.load(resolve_voice_path())
+    length_scale = max(speed if speed is not None else TALK_SPEED, 0.1)
+    synth_cfg = SynthesisConfig(length_scale=length_scale)
+    text = _clean_text_for_tts(text)
+
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(voice.config.sample_rate)
+        for chunk in voice.synthesize(text, syn_config=synth_cfg):
+            f.writeframesraw(chunk.audio_int16_bytes)
+    return buf.getvalue()
+
+
+def text_to_speech_stream(
+    text: str,
+    voice: Optional[PiperVoice] = None,
+    speed: Optional[float] = None,
+) -> None:
+    """
+    Synthesize and play chunk-by-chunk, starting playback on the first chunk.
+
+    Skips the temp-WAV write/read/delete cycle entirely; requires the optional
+    sounddevice + numpy packages (raises RuntimeError if they are missing).
+    """
+    if sd is None:
+        raise RuntimeError("sounddevice/numpy not installed; use text_to_speech instead.")
+
+    voice = voice or PiperVoice.load(resolve_voice_path())
+    length_scale = max(speed if speed is not None else TALK_SPEED, 0.1)
+    synth_cfg = SynthesisConfig(length_scale=length_scale)
+    text = _clean_text_for_tts(text)
+
+    with sd.OutputStream(samplerate=voice.config.sample_rate, channels=1, dtype="int16") as stream:
+        for chunk in voice.synthesize(text, syn_config=synth_cfg):
+            stream.write(np.frombuffer(chunk.audio_int16_bytes, dtype=np.int16))
+
+
 def play_text(text: str, voice: PiperVoice, status_cb=None):
     """Run TTS and playback in a thread-safe way."""
     if not _play_lock.acquire(blocking=False):
@@ -85,6 +171,7 @@ def play_text(text: str, voice: PiperVoice, status_cb=None):
             status_cb("Already playing, please wait...")
         return
 
+    wav_path = None
     try:
         if status_cb:
             status_cb("Synthesizing...")
@@ -93,13 +180,26 @@ def play_text(text: str, voice: PiperVoice, status_cb=None):
             status_cb("Playing...")
         winsound.PlaySound(wav_path, winsound.SND_FILENAME)
     finally:
-        if "wav_path" in locals() and os.path.exists(wav_path):
+        if wav_path and os.path.exists(wav_path):
             os.remove(wav_path)
         _play_lock.release()
         if status_cb:
             status_cb("Ready")
 
 
+def _tts_worker(voice: PiperVoice, jobs: "queue.Queue[str]", status_cb) -> None:
+    """Long-lived worker draining the GUI's TTS job queue one text at a time."""
+    while True:
+        text = jobs.get()
+        try:
+            play_text(text, voice, status_cb)
+        except Exception as exc:  # one bad job must not kill the worker
+            if status_cb:
+                status_cb(f"Playback error: {exc}")
+        finally:
+            jobs.task_done()
+
+
 def build_gui():
     model_path = resolve_voice_path()
     voice = PiperVoice.load(model_path)
@@ -120,11 +220,28 @@ def build_gui():
         status_var.config(text=msg)
         status_var.update_idletasks()
 
+    # One persistent worker instead of a fresh thread per click: no per-click
+    # spawn cost, and rapid clicks queue up deterministically instead of being
+    # dropped by the non-blocking play lock.
+    tts_jobs: "queue.Queue[str]" = queue.Queue()
+    threading.Thread(target=_tts_worker, args=(voice, tts_jobs, set_status), daemon=True).start()
+
     def do_read(current_text: str):
         if not current_text.strip():
             set_status("Enter text to read")
             return
-        threading.Thread(target=play_text, args=(current_text, voice, set_status), daemon=True).start()
+        tts_jobs.put(current_text)
+
+    def on_stop_clicked():
+        # drop anything still queued, then cut the current playback short
+        while True:
+            try:
+                tts_jobs.get_nowait()
+                tts_jobs.task_done()
+            except queue.Empty:
+                break
+        winsound.PlaySound(None, 0)
+        set_status("Stopped")
 
     def on_read_clicked():
         current_text = text_box.get("1.0", END)
@@ -145,6 +262,9 @@ def build_gui():
     read_btn = ttk.Button(button_frame, text="Read Text", command=on_read_clicked)
     read_btn.pack(side=LEFT, expand=True, fill=BOTH, padx=(0, 5))
 
+    stop_btn = ttk.Button(button_frame, text="Stop", command=on_stop_clicked)
+    stop_btn.pack(side=LEFT, expand=True, fill=BOTH, padx=(0, 5))
+
     paste_read_btn = ttk.Button(button_frame, text="Paste && Read", command=on_paste_read_clicked)
     paste_read_btn.pack(side=RIGHT, expand=True, fill=BOTH, padx=(5, 0))
 